@@ -1,456 +1,907 @@
-from typing import Any
+from typing import Any, Awaitable, Callable
 import asyncio
+from cachetools import TTLCache
+import fastjsonschema
 import httpx
+from httpx_aiohttp import AiohttpTransport
 from mcp.server.models import InitializationOptions
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
 import mcp.server.stdio
-import urllib.parse
-import json
-
-
-API_BASE = "pro-api.coinmarketcap.com"
+import orjson
+import logging
+import random
+
+
+API_BASE = "https://pro-api.coinmarketcap.com"
+LLAMA_API_BASE = "https://api.llama.fi"
+EXPAND_API_BASE = "https://api.expand.network"
+
+# Endpoint paths, relative to the base URL of each shared client.
+_CMC_LISTINGS_URL = "/v1/cryptocurrency/listings/latest"
+_CMC_INFO_URL = "/v2/cryptocurrency/info"
+_CMC_QUOTES_URL = "/v2/cryptocurrency/quotes/latest"
+_LLAMA_PROTOCOLS_URL = "/protocols"
+_LLAMA_TVL_URL = "/tvl/"
+_EXPAND_APR_URL = "/liquidstaking/getapr"
 API_KEY = None
 DEFI_API_KEY = None
 
+# Shared clients, one per upstream host, created in main() and reused across
+# tool calls so connections are kept alive between requests.
+CMC_CLIENT: httpx.AsyncClient | None = None
+LLAMA_CLIENT: httpx.AsyncClient | None = None
+EXPAND_CLIENT: httpx.AsyncClient | None = None
+
+# Caps on in-flight requests per host, to stay under upstream rate limits and
+# keep the connection pools from being exhausted.
+_CMC_SEM = asyncio.Semaphore(10)
+_LLAMA_SEM = asyncio.Semaphore(20)
+_EXPAND_SEM = asyncio.Semaphore(10)
+
+# Transient failures are retried with jittered backoff before giving up. The
+# aiohttp transport reports dropped connections as ConnectTimeout.
+_RETRY_DELAYS = (0.1, 0.3)
+_RETRYABLE_ERRORS = (httpx.NetworkError, httpx.RemoteProtocolError, httpx.ConnectTimeout)
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRY_AFTER = 5.0
+
+# Response bodies keyed by final request URL. Listings payloads can be several
+# MB, so that cache holds fewer entries.
+_CMC_CACHE = TTLCache(maxsize=256, ttl=60)
+_CMC_LISTINGS_CACHE = TTLCache(maxsize=16, ttl=60)
+_CMC_QUOTES_CACHE = TTLCache(maxsize=256, ttl=30)
+_LLAMA_CACHE = TTLCache(maxsize=256, ttl=60)
+_LLAMA_PROTOCOLS_CACHE = TTLCache(maxsize=1, ttl=120)
+_EXPAND_CACHE = TTLCache(maxsize=256, ttl=60)
+
+# get-coin-quotes lookups waiting to be coalesced, keyed by "id" or "symbol".
+_QUOTE_BATCH_WINDOW = 0.02
+_pending_quotes: dict[str, list[tuple[list[str], asyncio.Future]]] = {}
+_quote_flushes: set[asyncio.Task] = set()
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMAS: dict[str, dict[str, Any]] = {
+    "listing-coins": {
+        "type": "object",
+        "properties": {
+            "start": {
+                "type": "integer",
+                "description": "Optionally offset the start (1-based index) of the paginated list of items to return.",
+                "minimum": 1,
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Optionally specify the number of results to return.",
+                "minimum": 1,
+                "maximum": 5000,
+            },
+            "price_min": {
+                "type": "number",
+                "description": "Optionally specify a threshold of minimum USD price to filter results by.",
+                "minimum": 0,
+            },
+            "price_max": {
+                "type": "number",
+                "description": "Optionally specify a threshold of maximum USD price to filter results by.",
+                "minimum": 0,
+            },
+            "market_cap_min": {
+                "type": "number",
+                "description": "Optionally specify a threshold of minimum market cap to filter results by.",
+                "minimum": 0,
+            },
+            "market_cap_max": {
+                "type": "number",
+                "description": "Optionally specify a threshold of maximum market cap to filter results by.",
+                "minimum": 0,
+            },
+            "volume_24h_min": {
+                "type": "number",
+                "description": "Optionally specify a threshold of minimum 24 hour USD volume to filter results by.",
+                "minimum": 0,
+            },
+            "volume_24h_max": {
+                "type": "number",
+                "description": "Optionally specify a threshold of maximum 24 hour USD volume to filter results by.",
+                "minimum": 0,
+            },
+            "circulating_supply_min": {
+                "type": "number",
+                "description": "Optionally specify a threshold of minimum circulating supply to filter results by.",
+                "minimum": 0,
+            },
+            "circulating_supply_max": {
+                "type": "number",
+                "description": "Optionally specify a threshold of maximum circulating supply to filter results by.",
+                "minimum": 0,
+            },
+            "percent_change_24h_min": {
+                "type": "number",
+                "description": "Optionally specify a threshold of minimum 24 hour percent change to filter results by.",
+                "minimum": -100,
+            },
+            "percent_change_24h_max": {
+                "type": "number",
+                "description": "Optionally specify a threshold of maximum 24 hour percent change to filter results by.",
+                "minimum": -100,
+            },
+            "convert": {
+                "type": "string",
+                "description": "Optionally calculate market quotes in up to 120 currencies at once by passing a comma-separated list of cryptocurrency or fiat currency symbols.",
+            },
+            "convert_id": {
+                "type": "string",
+                "description": "Optionally calculate market quotes by CoinMarketCap ID instead of symbol.",
+            },
+            "sort": {
+                "type": "string",
+                "description": "What field to sort the list of cryptocurrencies by.",
+                "enum": [
+                    "market_cap",
+                    "name",
+                    "symbol",
+                    "date_added",
+                    "market_cap_strict",
+                    "price",
+                    "circulating_supply",
+                    "total_supply",
+                    "max_supply",
+                    "num_market_pairs",
+                    "volume_24h",
+                    "percent_change_1h",
+                    "percent_change_24h",
+                    "percent_change_7d",
+                    "market_cap_by_total_supply_strict",
+                    "volume_7d",
+                    "volume_30d",
+                ],
+            },
+            "sort_dir": {
+                "type": "string",
+                "description": "The direction in which to order cryptocurrencies against the specified sort.",
+                "enum": ["asc", "desc"],
+            },
+            "cryptocurrency_type": {
+                "type": "string",
+                "description": "The type of cryptocurrency to include.",
+                "enum": ["all", "coins", "tokens"],
+            },
+            "tag": {
+                "type": "string",
+                "description": "The tag of cryptocurrency to include.",
+                "enum": ["all", "defi", "filesharing"],
+            },
+            "aux": {
+                "type": "string",
+                "description": "Optionally specify a comma-separated list of supplemental data fields to return.",
+            },
 
-server = Server("coin-api")
-
-
-@server.list_tools()
-async def handle_list_tools() -> list[types.Tool]:
-    """
-    List available tools.
-    Each tool specifies its arguments using JSON Schema validation.
-    """
-    return [
-        types.Tool(
-            name="listing-coins",
-            description="Returns a paginated list of all active cryptocurrencies with latest market data",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "start": {
-                        "type": "integer",
-                        "description": "Optionally offset the start (1-based index) of the paginated list of items to return.",
-                        "minimum": 1,
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Optionally specify the number of results to return.",
-                        "minimum": 1,
-                        "maximum": 5000,
-                    },
-                    "price_min": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of minimum USD price to filter results by.",
-                        "minimum": 0,
-                    },
-                    "price_max": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of maximum USD price to filter results by.",
-                        "minimum": 0,
-                    },
-                    "market_cap_min": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of minimum market cap to filter results by.",
-                        "minimum": 0,
-                    },
-                    "market_cap_max": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of maximum market cap to filter results by.",
-                        "minimum": 0,
-                    },
-                    "volume_24h_min": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of minimum 24 hour USD volume to filter results by.",
-                        "minimum": 0,
-                    },
-                    "volume_24h_max": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of maximum 24 hour USD volume to filter results by.",
-                        "minimum": 0,
-                    },
-                    "circulating_supply_min": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of minimum circulating supply to filter results by.",
-                        "minimum": 0,
-                    },
-                    "circulating_supply_max": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of maximum circulating supply to filter results by.",
-                        "minimum": 0,
-                    },
-                    "percent_change_24h_min": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of minimum 24 hour percent change to filter results by.",
-                        "minimum": -100,
-                    },
-                    "percent_change_24h_max": {
-                        "type": "number",
-                        "description": "Optionally specify a threshold of maximum 24 hour percent change to filter results by.",
-                        "minimum": -100,
-                    },
-                    "convert": {
-                        "type": "string",
-                        "description": "Optionally calculate market quotes in up to 120 currencies at once by passing a comma-separated list of cryptocurrency or fiat currency symbols.",
-                    },
-                    "convert_id": {
-                        "type": "string",
-                        "description": "Optionally calculate market quotes by CoinMarketCap ID instead of symbol.",
-                    },
-                    "sort": {
-                        "type": "string",
-                        "description": "What field to sort the list of cryptocurrencies by.",
-                        "enum": [
-                            "market_cap",
-                            "name",
-                            "symbol",
-                            "date_added",
-                            "market_cap_strict",
-                            "price",
-                            "circulating_supply",
-                            "total_supply",
-                            "max_supply",
-                            "num_market_pairs",
-                            "volume_24h",
-                            "percent_change_1h",
-                            "percent_change_24h",
-                            "percent_change_7d",
-                            "market_cap_by_total_supply_strict",
-                            "volume_7d",
-                            "volume_30d",
-                        ],
-                    },
-                    "sort_dir": {
-                        "type": "string",
-                        "description": "The direction in which to order cryptocurrencies against the specified sort.",
-                        "enum": ["asc", "desc"],
-                    },
-                    "cryptocurrency_type": {
-                        "type": "string",
-                        "description": "The type of cryptocurrency to include.",
-                        "enum": ["all", "coins", "tokens"],
-                    },
-                    "tag": {
-                        "type": "string",
-                        "description": "The tag of cryptocurrency to include.",
-                        "enum": ["all", "defi", "filesharing"],
-                    },
-                    "aux": {
-                        "type": "string",
-                        "description": "Optionally specify a comma-separated list of supplemental data fields to return.",
-                    },
-
+        },
+        "required": [],
+    },
+    "get-coin-info": {
+        "type": "object",
+        "properties": {
+            "id": {
+                "type": "string",
+                "description": "One or more comma-separated CoinMarketCap cryptocurrency IDs. Example: \"1,2\"",
+            },
+            "slug": {
+                "type": "string",
+                "description": "Alternatively pass a comma-separated list of cryptocurrency slugs. Example: \"bitcoin,ethereum\"",
+            },
+            "symbol": {
+                "type": "string",
+                "description": "Alternatively pass one or more comma-separated cryptocurrency symbols. Example: \"BTC,ETH\"",
+            },
+            "address": {
+                "type": "string",
+                "description": "Alternatively pass in a contract address. Example: \"0xc40af1e4fecfa05ce6bab79dcd8b373d2e436c4e\"",
+            },
+            "skip_invalid": {
+                "type": "boolean",
+                "description": "Pass true to relax request validation rules. When requesting records on multiple cryptocurrencies an error is returned if any invalid cryptocurrencies are requested or a cryptocurrency does not have matching records in the requested timeframe. If set to true, invalid lookups will be skipped allowing valid cryptocurrencies to still be returned.",
+                "default": False,
+            },
+            "aux": {
+                "type": "string",
+                "description": "Optionally specify a comma-separated list of supplemental data fields to return. Pass urls,logo,description,tags,platform,date_added,notice,status to include all auxiliary fields.",
+            },
+        },
+        "required": [],
+    },
+    "get-coin-quotes": {
+        "type": "object",
+        "properties": {
+            "id": {
+                "type": "string",
+                "description": "One or more comma-separated cryptocurrency CoinMarketCap IDs. Example: 1,2",
+            },
+            "slug": {
+                "type": "string",
+                "description": "Alternatively pass a comma-separated list of cryptocurrency slugs. Example: \"bitcoin,ethereum\"",
+            },
+            "symbol": {
+                "type": "string",
+                "description": "Alternatively pass one or more comma-separated cryptocurrency symbols. Example: \"BTC,ETH\"",
+            },
+            "convert": {
+                "type": "string",
+                "description": "Optionally calculate market quotes in up to 120 currencies at once by passing a comma-separated list of cryptocurrency or fiat currency symbols.",
+            },
+            "convert_id": {
+                "type": "string",
+                "description": "Optionally calculate market quotes by CoinMarketCap ID instead of symbol. This option is identical to convert outside of ID format.",
+            },
+            "aux": {
+                "type": "string",
+                "description": "\"num_market_pairs,cmc_rank,date_added,tags,platform,max_supply,circulating_supply,total_supply,is_active,is_fiat\"Optionally specify a comma-separated list of supplemental data fields to return.",
+            },
+            "skip_invalid": {
+                "type": "boolean",
+                "description": "Pass true to relax request validation rules.",
+                "default": False,
+            },
+        },
+        "required": [],
+    },
+    "get-protocols": {
+        "type": "object",
+        "properties": {
+            "id": {
+                "type": "string",
+                "description": "One or more comma-separated cryptocurrency CoinMarketCap IDs. Example: 1,2",
+            },
+            "slug": {
+                "type": "string",
+                "description": "Alternatively pass a comma-separated list of cryptocurrency slugs. Example: \"bitcoin,ethereum\"",
+            },
+            "symbol": {
+                "type": "string",
+                "description": "Alternatively pass one or more comma-separated cryptocurrency symbols. Example: \"BTC,ETH\"",
+            },
+            "convert": {
+                "type": "string",
+                "description": "Optionally calculate market quotes in up to 120 currencies at once by passing a comma-separated list of cryptocurrency or fiat currency symbols.",
+            },
+            "convert_id": {
+                "type": "string",
+                "description": "Optionally calculate market quotes by CoinMarketCap ID instead of symbol. This option is identical to convert outside of ID format.",
+            },
+            "aux": {
+                "type": "string",
+                "description": "\"num_market_pairs,cmc_rank,date_added,tags,platform,max_supply,circulating_supply,total_supply,is_active,is_fiat\"Optionally specify a comma-separated list of supplemental data fields to return.",
+            },
+            "skip_invalid": {
+                "type": "boolean",
+                "description": "Pass true to relax request validation rules.",
+                "default": False,
+            },
+        },
+        "required": [],
+    },
+    "listing-protocols": {
+        "type": "object",
+        "properties": {
+            "id": {
+                "type": "string",
+                "description": "The unique identifier of the protocol",
+            },
+            "name": {
+                "type": "string",
+                "description": "The name of the protocol",
+            },
+            "symbol": {
+                "type": "string",
+                "description": "The symbol associated with the protocol",
+            },
+            "url": {
+                "type": "string",
+                "description": "The official website URL of the protocol",
+            },
+            "description": {
+                "type": "string",
+                "description": "A detailed description of the protocol",
+            },
+            "chain": {
+                "type": "string",
+                "description": "The primary chain the protocol operates on",
+            },
+            "logo": {
+                "type": "string",
+                "description": "URL to the protocol's logo image",
+            },
+            "audits": {
+                "type": "string",
+                "description": "Number of security audits performed",
+            },
+            "audit_note": {
+                "type": ["string", "null"],
+                "description": "Additional notes about protocol audits",
+            },
+            "category": {
+                "type": "string",
+                "description": "The category of the protocol (e.g., CEX, DEX, Lending)",
+            },
+            "chains": {
+                "type": "array",
+                "items": {
+                    "type": "string"
                 },
-                "required": [],
+                "description": "List of blockchain networks supported by the protocol",
             },
-        ),
-        types.Tool(
-            name="get-coin-info",
-            description="Get coins' information includes details like logo, description, official website URL, social links, and links to a cryptocurrency's technical documentation.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "id": {
-                        "type": "string",
-                        "description": "One or more comma-separated CoinMarketCap cryptocurrency IDs. Example: \"1,2\"",
-                    },
-                    "slug": {
-                        "type": "string",
-                        "description": "Alternatively pass a comma-separated list of cryptocurrency slugs. Example: \"bitcoin,ethereum\"",
-                    },
-                    "symbol": {
-                        "type": "string",
-                        "description": "Alternatively pass one or more comma-separated cryptocurrency symbols. Example: \"BTC,ETH\"",
-                    },
-                    "address": {
-                        "type": "string",
-                        "description": "Alternatively pass in a contract address. Example: \"0xc40af1e4fecfa05ce6bab79dcd8b373d2e436c4e\"",
-                    },
-                    "skip_invalid": {
-                        "type": "boolean",
-                        "description": "Pass true to relax request validation rules. When requesting records on multiple cryptocurrencies an error is returned if any invalid cryptocurrencies are requested or a cryptocurrency does not have matching records in the requested timeframe. If set to true, invalid lookups will be skipped allowing valid cryptocurrencies to still be returned.",
-                        "default": False,
-                    },
-                    "aux": {
-                        "type": "string",
-                        "description": "Optionally specify a comma-separated list of supplemental data fields to return. Pass urls,logo,description,tags,platform,date_added,notice,status to include all auxiliary fields.",
-                    },
+            "twitter": {
+                "type": "string",
+                "description": "Twitter handle of the protocol",
+            },
+            "forkedFrom": {
+                "type": "array",
+                "items": {
+                    "type": "string"
                 },
-                "required": [],
-            }
-        ),
-        types.Tool(
-            name="get-coin-quotes",
-            description='''the latest market quote for 1 or more cryptocurrencies. Use the "convert" option to return market values in multiple fiat and cryptocurrency conversions in the same call.''',
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "id": {
-                        "type": "string",
-                        "description": "One or more comma-separated cryptocurrency CoinMarketCap IDs. Example: 1,2",
-                    },
-                    "slug": {
-                        "type": "string",
-                        "description": "Alternatively pass a comma-separated list of cryptocurrency slugs. Example: \"bitcoin,ethereum\"",
-                    },
-                    "symbol": {
-                        "type": "string",
-                        "description": "Alternatively pass one or more comma-separated cryptocurrency symbols. Example: \"BTC,ETH\"",
-                    },
-                    "convert": {
-                        "type": "string",
-                        "description": "Optionally calculate market quotes in up to 120 currencies at once by passing a comma-separated list of cryptocurrency or fiat currency symbols.",
-                    },
-                    "convert_id": {
-                        "type": "string",
-                        "description": "Optionally calculate market quotes by CoinMarketCap ID instead of symbol. This option is identical to convert outside of ID format.",
-                    },
-                    "aux": {
-                        "type": "string",
-                        "description": "\"num_market_pairs,cmc_rank,date_added,tags,platform,max_supply,circulating_supply,total_supply,is_active,is_fiat\"Optionally specify a comma-separated list of supplemental data fields to return.",
-                    },
-                    "skip_invalid": {
-                        "type": "boolean",
-                        "description": "Pass true to relax request validation rules.",
-                        "default": False,
-                    },
+                "description": "List of protocols this one was forked from",
+            },
+            "oracles": {
+                "type": "array",
+                "items": {
+                    "type": "string"
                 },
-                "required": [],
+                "description": "List of oracle services used by the protocol",
             },
-        ),
-        types.Tool(
-            name="get-protocols",
-            description='''List all protocols along with their tvl(total value locked).''',
-            inputSchema={
+            "listedAt": {
+                "type": "integer",
+                "description": "Unix timestamp when the protocol was first listed",
+            },
+            "methodology": {
+                "type": "string",
+                "description": "Description of how protocol data is collected and calculated",
+            },
+            "slug": {
+                "type": "string",
+                "description": "URL-friendly identifier for the protocol",
+            },
+            "tvl": {
+                "type": "number",
+                "description": "Total Value Locked in the protocol across all chains",
+            },
+            "chainTvls": {
                 "type": "object",
-                "properties": {
-                    "id": {
-                        "type": "string",
-                        "description": "One or more comma-separated cryptocurrency CoinMarketCap IDs. Example: 1,2",
-                    },
-                    "slug": {
-                        "type": "string",
-                        "description": "Alternatively pass a comma-separated list of cryptocurrency slugs. Example: \"bitcoin,ethereum\"",
-                    },
-                    "symbol": {
-                        "type": "string",
-                        "description": "Alternatively pass one or more comma-separated cryptocurrency symbols. Example: \"BTC,ETH\"",
-                    },
-                    "convert": {
-                        "type": "string",
-                        "description": "Optionally calculate market quotes in up to 120 currencies at once by passing a comma-separated list of cryptocurrency or fiat currency symbols.",
-                    },
-                    "convert_id": {
-                        "type": "string",
-                        "description": "Optionally calculate market quotes by CoinMarketCap ID instead of symbol. This option is identical to convert outside of ID format.",
-                    },
-                    "aux": {
-                        "type": "string",
-                        "description": "\"num_market_pairs,cmc_rank,date_added,tags,platform,max_supply,circulating_supply,total_supply,is_active,is_fiat\"Optionally specify a comma-separated list of supplemental data fields to return.",
-                    },
-                    "skip_invalid": {
-                        "type": "boolean",
-                        "description": "Pass true to relax request validation rules.",
-                        "default": False,
-                    },
-                },
-                "required": [],
+                "description": "Breakdown of TVL by individual chains",
+                "additionalProperties": {
+                    "type": "number"
+                }
             },
-        ),
-        types.Tool(
-            name="listing-protocols",
-            description="Get detailed information about a specific protocol including its TVL, supported chains, and other metadata",
-            inputSchema={
+            "change_1h": {
+                "type": "number",
+                "description": "Percentage change in TVL over the last hour",
+            },
+            "change_1d": {
+                "type": "number",
+                "description": "Percentage change in TVL over the last 24 hours",
+            },
+            "change_7d": {
+                "type": "number",
+                "description": "Percentage change in TVL over the last 7 days",
+            },
+            "tokenBreakdowns": {
                 "type": "object",
-                "properties": {
-                    "id": {
-                        "type": "string",
-                        "description": "The unique identifier of the protocol",
-                    },
-                    "name": {
-                        "type": "string",
-                        "description": "The name of the protocol",
-                    },
-                    "symbol": {
-                        "type": "string",
-                        "description": "The symbol associated with the protocol",
-                    },
-                    "url": {
-                        "type": "string",
-                        "description": "The official website URL of the protocol",
-                    },
-                    "description": {
-                        "type": "string",
-                        "description": "A detailed description of the protocol",
-                    },
-                    "chain": {
-                        "type": "string",
-                        "description": "The primary chain the protocol operates on",
-                    },
-                    "logo": {
-                        "type": "string",
-                        "description": "URL to the protocol's logo image",
-                    },
-                    "audits": {
-                        "type": "string",
-                        "description": "Number of security audits performed",
-                    },
-                    "audit_note": {
-                        "type": ["string", "null"],
-                        "description": "Additional notes about protocol audits",
-                    },
-                    "category": {
-                        "type": "string",
-                        "description": "The category of the protocol (e.g., CEX, DEX, Lending)",
-                    },
-                    "chains": {
-                        "type": "array",
-                        "items": {
-                            "type": "string"
-                        },
-                        "description": "List of blockchain networks supported by the protocol",
-                    },
-                    "twitter": {
-                        "type": "string",
-                        "description": "Twitter handle of the protocol",
-                    },
-                    "forkedFrom": {
-                        "type": "array",
-                        "items": {
-                            "type": "string"
-                        },
-                        "description": "List of protocols this one was forked from",
-                    },
-                    "oracles": {
-                        "type": "array",
-                        "items": {
-                            "type": "string"
-                        },
-                        "description": "List of oracle services used by the protocol",
-                    },
-                    "listedAt": {
-                        "type": "integer",
-                        "description": "Unix timestamp when the protocol was first listed",
-                    },
-                    "methodology": {
-                        "type": "string",
-                        "description": "Description of how protocol data is collected and calculated",
-                    },
-                    "slug": {
-                        "type": "string",
-                        "description": "URL-friendly identifier for the protocol",
-                    },
-                    "tvl": {
-                        "type": "number",
-                        "description": "Total Value Locked in the protocol across all chains",
-                    },
-                    "chainTvls": {
-                        "type": "object",
-                        "description": "Breakdown of TVL by individual chains",
-                        "additionalProperties": {
-                            "type": "number"
-                        }
-                    },
-                    "change_1h": {
-                        "type": "number",
-                        "description": "Percentage change in TVL over the last hour",
-                    },
-                    "change_1d": {
-                        "type": "number",
-                        "description": "Percentage change in TVL over the last 24 hours",
-                    },
-                    "change_7d": {
-                        "type": "number",
-                        "description": "Percentage change in TVL over the last 7 days",
-                    },
-                    "tokenBreakdowns": {
-                        "type": "object",
-                        "description": "Breakdown of protocol's token distributions",
-                        "additionalProperties": {
-                            "type": "object"
-                        }
-                    },
-                    "mcap": {
-                        "type": ["number", "null"],
-                        "description": "Market capitalization of the protocol's token",
-                    }
-                },
-                "required": []
+                "description": "Breakdown of protocol's token distributions",
+                "additionalProperties": {
+                    "type": "object"
+                }
+            },
+            "mcap": {
+                "type": ["number", "null"],
+                "description": "Market capitalization of the protocol's token",
             }
-        ),
-        types.Tool(
-            name="get-protocol-tvl",
-            description="Fetches the Total Value Locked (TVL) for a specific protocol.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "protocol": {
-                        "type": "string",
-                        "description": "The URL-friendly identifier for the protocol.",
-                    },
-                },
-                "required": ["protocol"],
+        },
+        "required": []
+    },
+    "get-protocol-tvl": {
+        "type": "object",
+        "properties": {
+            "protocol": {
+                "type": "string",
+                "description": "The URL-friendly identifier for the protocol.",
             },
-        ),
-        types.Tool(
-            name="get-apr",
-            description="Fetches the Annual Percentage Rate for a specific protocol.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "liquidStakingId": {
-                        "type": "string",
-                        "description": "ID for liquid staking. This ID is required to get the APR for the protocol",
-                    },
-                },
-                "required": ["liquidStakingId"],
+        },
+        "required": ["protocol"],
+    },
+    "get-apr": {
+        "type": "object",
+        "properties": {
+            "liquidStakingId": {
+                "type": "string",
+                "description": "ID for liquid staking. This ID is required to get the APR for the protocol",
             },
-        ),
-    ]
+        },
+        "required": ["liquidStakingId"],
+    },
+}
+
+# Validators generated once at import so argument checks are a plain call.
+TOOL_SCHEMAS = {
+    name: fastjsonschema.compile(schema, use_default=False)
+    for name, schema in _SCHEMAS.items()
+}
+
+# Query parameters forwarded upstream for each tool.
+_LISTING_KEYS = frozenset({
+    "start",
+    "limit",
+    "price_min",
+    "price_max",
+    "market_cap_min",
+    "market_cap_max",
+    "volume_24h_min",
+    "volume_24h_max",
+    "circulating_supply_min",
+    "circulating_supply_max",
+    "percent_change_24h_min",
+    "percent_change_24h_max",
+    "convert",
+    "convert_id",
+    "sort",
+    "sort_dir",
+    "cryptocurrency_type",
+    "tag",
+    "aux",
+})
+_COIN_INFO_KEYS = frozenset({
+    "id",
+    "slug",
+    "symbol",
+    "address",
+    "skip_invalid",
+    "aux",
+})
+_COIN_QUOTES_KEYS = frozenset({
+    "id",
+    "slug",
+    "symbol",
+    "convert",
+    "convert_id",
+    "aux",
+    "skip_invalid",
+})
+_PROTOCOL_TVL_KEYS = frozenset({
+    "protocol",
+})
+_APR_KEYS = frozenset({
+    "liquidStakingId",
+})
+# get-coin-quotes calls made with only one of these can share an upstream call.
+_BATCHABLE_QUOTE_KEYS = frozenset({
+    "id",
+    "symbol",
+})
+
+_TOOLS: list[types.Tool] = [
+    types.Tool(
+        name="listing-coins",
+        description="Returns a paginated list of all active cryptocurrencies with latest market data",
+        inputSchema=_SCHEMAS["listing-coins"],
+    ),
+    types.Tool(
+        name="get-coin-info",
+        description="Get coins' information includes details like logo, description, official website URL, social links, and links to a cryptocurrency's technical documentation.",
+        inputSchema=_SCHEMAS["get-coin-info"],
+    ),
+    types.Tool(
+        name="get-coin-quotes",
+        description='''the latest market quote for 1 or more cryptocurrencies. Use the "convert" option to return market values in multiple fiat and cryptocurrency conversions in the same call.''',
+        inputSchema=_SCHEMAS["get-coin-quotes"],
+    ),
+    types.Tool(
+        name="get-protocols",
+        description='''List all protocols along with their tvl(total value locked).''',
+        inputSchema=_SCHEMAS["get-protocols"],
+    ),
+    types.Tool(
+        name="listing-protocols",
+        description="Get detailed information about a specific protocol including its TVL, supported chains, and other metadata",
+        inputSchema=_SCHEMAS["listing-protocols"],
+    ),
+    types.Tool(
+        name="get-protocol-tvl",
+        description="Fetches the Total Value Locked (TVL) for a specific protocol.",
+        inputSchema=_SCHEMAS["get-protocol-tvl"],
+    ),
+    types.Tool(
+        name="get-apr",
+        description="Fetches the Annual Percentage Rate for a specific protocol.",
+        inputSchema=_SCHEMAS["get-apr"],
+    ),
+]
 
 
-async def make_coinmarketcap_request(client: httpx.AsyncClient, url: str) -> dict[str, Any] | None:
-    """Make a request to the CoinMarketCap API with proper error handling."""
-    headers = {
-        'Accepts': 'application/json',
-        'X-CMC_PRO_API_KEY': API_KEY,
-    }
+server = Server("coin-api")
+
+
+@server.list_tools()
+async def handle_list_tools() -> list[types.Tool]:
+    """
+    List available tools.
+    Each tool specifies its arguments using JSON Schema validation.
+    """
+    return _TOOLS
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a decoded API payload back to JSON text."""
+    return orjson.dumps(obj).decode()
+
+
+def _make_client(base_url: str, headers: dict[str, str]) -> httpx.AsyncClient:
+    """
+    Create a pooled client for one upstream host.
+    Requests go through aiohttp's connector and parser while keeping the httpx API.
+    """
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        transport=AiohttpTransport(
+            limits=httpx.Limits(max_connections=100),
+        ),
+        timeout=10.0,
+    )
+
+
+def _build_request(
+    client: httpx.AsyncClient, path: str, params: dict[str, Any] | None
+) -> httpx.Request:
+    """Build a GET whose URL, with params sorted, doubles as the cache key."""
+    return client.build_request(
+        "GET", path, params=sorted(params.items()) if params else None
+    )
+
+
+async def _fetch_text(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    cache: TTLCache,
+    path: str,
+    params: dict[str, Any] | None,
+) -> str | None:
+    """
+    Fetch a response body, serving it from the TTL cache when still fresh.
+    Any failure is logged and reported as None; callers that need to tell a
+    transient failure from a rejected request use _fetch_text_or_raise.
+    """
     try:
-        response = await client.get(url, headers=headers, timeout=10.0)
-        response.raise_for_status()
-        return response.json()
-    except Exception:
+        return await _fetch_text_or_raise(client, semaphore, cache, path, params)
+    except Exception as e:
+        logger.warning("GET %s failed: %r", path, e)
         return None
 
 
-async def make_defillama_request(client: httpx.AsyncClient, url: str) -> dict[str, Any] | None:
-    """Make a request to the DeFi Llama API with proper error handling."""
-    headers = {
-        'accept': '*/*',
-    }
+async def _fetch_text_or_raise(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    cache: TTLCache,
+    path: str,
+    params: dict[str, Any] | None,
+) -> str | None:
+    """
+    Like _fetch_text, but raise the last error once connection errors, 429 and
+    5xx responses have exhausted their retries, or straight away for anything
+    else (e.g. a 4xx). None still means the body was not a non-empty JSON payload.
+    """
+    request = _build_request(client, path, params)
+    key = str(request.url)
+    text = cache.get(key)
+    if text is not None:
+        return text
+    for attempt in range(len(_RETRY_DELAYS) + 1):
+        try:
+            async with semaphore:
+                # Decode the body chunk by chunk as it arrives rather than
+                # buffering the whole compressed payload first.
+                response = await client.send(request, stream=True)
+                try:
+                    response.raise_for_status()
+                    text = "".join([chunk async for chunk in response.aiter_text()])
+                finally:
+                    await response.aclose()
+        except (*_RETRYABLE_ERRORS, httpx.HTTPStatusError) as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+        else:
+            text = _forwardable(text)
+            if text is None:
+                logger.warning("GET %s returned an empty or non-JSON body", request.url)
+            else:
+                cache[key] = text
+            return text
+
+
+def _retry_delay(error: Exception, attempt: int) -> float | None:
+    """Return how long to wait before retrying a failed request, or None to give up."""
+    if attempt >= len(_RETRY_DELAYS):
+        return None
+    if isinstance(error, httpx.HTTPStatusError):
+        response = error.response
+        if response.status_code not in _RETRYABLE_STATUS:
+            return None
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                seconds = float(retry_after)
+            except ValueError:
+                pass
+            else:
+                return seconds if seconds <= _MAX_RETRY_AFTER else None
+    base = _RETRY_DELAYS[attempt]
+    return random.uniform(base / 2, base * 1.5)
+
+
+def _forwardable(text: str) -> str | None:
+    """
+    Return a raw body if it looks like a non-empty JSON payload, otherwise None.
+    Keeps the same failure check as for decoded payloads, so "{}", "[]" or an
+    HTML error page is not forwarded (or cached) as a successful result. Only
+    the ends of the text are looked at; the body is never parsed here.
+    """
+    body = text.strip()
+    if body[:1] in ("{", "[") and body not in ("{}", "[]"):
+        return text
+    return None
+
+
+def _loads(text: str | None) -> dict[str, Any] | None:
+    """Decode a fetched body, treating malformed JSON as a failed request."""
+    if text is None:
+        return None
     try:
-        response = await client.get(url, headers=headers, timeout=10.0)
-        response.raise_for_status()
-        return response.json()
-    except Exception:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
         return None
 
 
-async def make_expand_network_request(client: httpx.AsyncClient, url: str) -> dict[str, Any] | None:
-    """Make a request to the Expand Network API with proper error handling."""
-    headers = {
-        'accept': '*/*',
-        'X-API-Key': DEFI_API_KEY,
+async def make_coinmarketcap_request_raw(
+    path: str, params: dict[str, Any] | None = None, cache: TTLCache = _CMC_CACHE
+) -> str | None:
+    """
+    Make a request to the CoinMarketCap API and return the body undecoded.
+    Used where the payload is forwarded verbatim, skipping the parse/dump round trip.
+    """
+    return await _fetch_text(CMC_CLIENT, _CMC_SEM, cache, path, params)
 
-    }
-    try:
-        response = await client.get(url, headers=headers, timeout=10.0)
-        response.raise_for_status()
-        return response.json()
-    except Exception:
+
+async def make_defillama_request_raw(
+    path: str, params: dict[str, Any] | None = None, cache: TTLCache = _LLAMA_CACHE
+) -> str | None:
+    """Make a request to the DeFi Llama API and return the body undecoded."""
+    return await _fetch_text(LLAMA_CLIENT, _LLAMA_SEM, cache, path, params)
+
+
+async def make_expand_network_request_raw(
+    path: str, params: dict[str, Any] | None = None, cache: TTLCache = _EXPAND_CACHE
+) -> str | None:
+    """Make a request to the Expand Network API and return the body undecoded."""
+    return await _fetch_text(EXPAND_CLIENT, _EXPAND_SEM, cache, path, params)
+
+
+async def _batched_coin_quotes(key: str, value: str) -> str | None:
+    """
+    Fetch quotes for comma-separated ids or symbols, sharing one upstream call
+    with any other lookups by the same key that arrive within the batch window.
+    """
+    values = [v.strip() for v in value.split(",") if v.strip()]
+    # A fresh cached answer needs no upstream call, so don't wait for the window.
+    request = _build_request(CMC_CLIENT, _CMC_QUOTES_URL, {key: ",".join(values)})
+    text = _CMC_QUOTES_CACHE.get(str(request.url))
+    if text is not None:
+        return text
+    loop = asyncio.get_running_loop()
+    batch = _pending_quotes.setdefault(key, [])
+    if not batch:
+        loop.call_later(_QUOTE_BATCH_WINDOW, _start_quote_flush, key)
+    future = loop.create_future()
+    batch.append((values, future))
+    return await future
+
+
+def _start_quote_flush(key: str) -> None:
+    """Close the pending batch for key and resolve it in a background task."""
+    task = asyncio.create_task(_flush_quotes(key, _pending_quotes.pop(key)))
+    _quote_flushes.add(task)
+    task.add_done_callback(_quote_flushes.discard)
+
+
+def _slice_quotes(data: dict[str, Any], key: str, values: list[str]) -> str | None:
+    """
+    Pick one caller's entries out of a combined quotes response.
+    Returns None when none of them came back, matching the error an unbatched
+    call for the same entries gets from CMC.
+    """
+    quotes = data.get("data") or {}
+    if key == "symbol":
+        values = [v.upper() for v in values]
+    sliced = {v: quotes[v] for v in values if v in quotes}
+    if not sliced:
         return None
+    return _dumps({**data, "data": sliced})
+
+
+async def _fetch_merged_quotes(key: str, batch_values: list[list[str]]) -> list[str | None]:
+    """Fetch quotes for several callers in one request and slice out each one's part."""
+    merged = ",".join(dict.fromkeys(v for values in batch_values for v in values))
+    try:
+        text = await _fetch_text_or_raise(
+            CMC_CLIENT, _CMC_SEM, _CMC_QUOTES_CACHE, _CMC_QUOTES_URL, {key: merged}
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 400:
+            # An outage, rate limit or key/plan problem (401, 402, 403) would
+            # fail every separate request too, and retrying each caller only
+            # adds load, so everyone in the batch fails together.
+            logger.warning("GET %s failed: %r", _CMC_QUOTES_URL, e)
+            return [None] * len(batch_values)
+        # CMC rejects the whole call with a 400 if any one entry is invalid, so
+        # fall back to separate requests rather than failing everyone.
+        return await asyncio.gather(*(
+            make_coinmarketcap_request_raw(_CMC_QUOTES_URL, {key: ",".join(values)}, cache=_CMC_QUOTES_CACHE)
+            for values in batch_values
+        ))
+    except Exception as e:
+        logger.warning("GET %s failed: %r", _CMC_QUOTES_URL, e)
+        return [None] * len(batch_values)
+    data = _loads(text)
+    if not data:
+        return [None] * len(batch_values)
+    return [_slice_quotes(data, key, values) for values in batch_values]
+
+
+async def _flush_quotes(key: str, batch: list[tuple[list[str], asyncio.Future]]) -> None:
+    """Issue one quotes request for a whole batch and hand each caller its slice."""
+    try:
+        if len(batch) == 1:
+            # Nothing to slice, so the body is forwarded as-is.
+            values, _ = batch[0]
+            results = [await make_coinmarketcap_request_raw(_CMC_QUOTES_URL, {key: ",".join(values)}, cache=_CMC_QUOTES_CACHE)]
+        else:
+            results = await _fetch_merged_quotes(key, [values for values, _ in batch])
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    finally:
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+
+# Failure responses are constant; the server copies the list and only reads the
+# content when serializing, so the same objects can be returned on every call.
+_FAIL_LISTING = [types.TextContent(type="text", text="Failed to retrieve listing data")]
+_FAIL_COIN_INFO = [types.TextContent(type="text", text="Failed to retrieve coin info data")]
+_FAIL_COIN_QUOTES = [types.TextContent(type="text", text="Failed to retrieve coin quotes data")]
+_FAIL_PROTOCOLS = [types.TextContent(type="text", text="Failed to retrieve protocols data")]
+_FAIL_PROTOCOL_TVL = [types.TextContent(type="text", text="Failed to retrieve protocols tvl data")]
+_FAIL_APR = [types.TextContent(type="text", text="Failed to retrieve protocols APR data.")]
+
+
+async def _listing_coins(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Fetch the latest listings of all active cryptocurrencies."""
+    request_data = {k: arguments[k] for k in arguments.keys() & _LISTING_KEYS}
+
+    listing_data = await make_coinmarketcap_request_raw(
+        _CMC_LISTINGS_URL, request_data, cache=_CMC_LISTINGS_CACHE
+    )
+
+    if not listing_data:
+        return _FAIL_LISTING
+
+    return [
+        types.TextContent(
+            type="text",
+            text=listing_data
+        )
+    ]
+
+
+async def _get_coin_info(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Fetch metadata for one or more cryptocurrencies."""
+    request_data = {k: arguments[k] for k in arguments.keys() & _COIN_INFO_KEYS}
+
+    coin_info_data = await make_coinmarketcap_request_raw(_CMC_INFO_URL, request_data)
+
+    if not coin_info_data:
+        return _FAIL_COIN_INFO
+
+    return [
+        types.TextContent(
+            type="text",
+            text=coin_info_data
+        )
+    ]
+
+
+async def _get_coin_quotes(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Fetch the latest market quotes for one or more cryptocurrencies."""
+    request_data = {k: arguments[k] for k in arguments.keys() & _COIN_QUOTES_KEYS}
+
+    if len(request_data) == 1 and request_data.keys() <= _BATCHABLE_QUOTE_KEYS:
+        [(key, value)] = request_data.items()
+        coin_quotes_text = await _batched_coin_quotes(key, value)
+    else:
+        coin_quotes_text = await make_coinmarketcap_request_raw(
+            _CMC_QUOTES_URL, request_data, cache=_CMC_QUOTES_CACHE
+        )
+
+    if not coin_quotes_text:
+        return _FAIL_COIN_QUOTES
+
+    return [
+        types.TextContent(
+            type="text",
+            text=coin_quotes_text
+        )
+    ]
+
+
+async def _listing_protocols(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Fetch all protocols along with their TVL."""
+    protocols_data = await make_defillama_request_raw(_LLAMA_PROTOCOLS_URL, cache=_LLAMA_PROTOCOLS_CACHE)
+
+    if not protocols_data:
+        return _FAIL_PROTOCOLS
+
+    return [
+        types.TextContent(
+            type="text",
+            text=protocols_data
+        )
+    ]
+
+
+async def _get_protocol_tvl(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Fetch the TVL for a single protocol."""
+    request_data = {k: arguments[k] for k in arguments.keys() & _PROTOCOL_TVL_KEYS}
+
+    protocols_data = await make_defillama_request_raw(_LLAMA_TVL_URL + request_data['protocol'])
+
+    if not protocols_data:
+        return _FAIL_PROTOCOL_TVL
+
+    return [
+        types.TextContent(
+            type="text",
+            text=protocols_data
+        )
+    ]
+
+
+async def _get_apr(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Fetch the APR for a liquid staking protocol."""
+    request_data = {k: arguments[k] for k in arguments.keys() & _APR_KEYS}
+
+    protocols_data = await make_expand_network_request_raw(_EXPAND_APR_URL, request_data)
+
+    if not protocols_data:
+        return _FAIL_APR
+
+    return [
+        types.TextContent(
+            type="text",
+            text=protocols_data
+        )
+    ]
+
+
+_DISPATCH: dict[str, Callable[[dict[str, Any]], Awaitable[list[types.TextContent]]]] = {
+    "listing-coins": _listing_coins,
+    "get-coin-info": _get_coin_info,
+    "get-coin-quotes": _get_coin_quotes,
+    "listing-protocols": _listing_protocols,
+    "get-protocol-tvl": _get_protocol_tvl,
+    "get-apr": _get_apr,
+}
 
 
 @server.call_tool()
@@ -467,179 +918,31 @@ async def handle_call_tool(
     - get-protocol-tvl : fetches a tvl for the particular protocol.
     - get-apr : fetches APR for the particular protocol.
     """
+    try:
+        handler = _DISPATCH[name]
+    except KeyError:
+        raise ValueError(f"Unknown tool: {name}") from None
 
-    if name == "listing-coins":
-        request_data = {}
-        if arguments is not None:
-            condi_keys = [
-                "start",
-                "limit",
-                "price_min",
-                "price_max",
-                "market_cap_min",
-                "market_cap_max",
-                "volume_24h_min",
-                "volume_24h_max",
-                "circulating_supply_min",
-                "circulating_supply_max",
-                "percent_change_24h_min",
-                "percent_change_24h_max",
-                "convert",
-                "convert_id",
-                "sort",
-                "sort_dir",
-                "cryptocurrency_type",
-                "tag",
-                "aux",
-            ]
-
-            for key in arguments.keys():
-                if key in condi_keys:
-                    request_data[key] = arguments[key]
-
-        async with httpx.AsyncClient() as client:
-            listing_url = f"https://{API_BASE}/v1/cryptocurrency/listings/latest?{urllib.parse.urlencode(request_data)}"
-
-            listing_data = await make_coinmarketcap_request(client, listing_url)
-
-            if not listing_data:
-                return [types.TextContent(type="text", text="Failed to retrieve listing data")]
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(listing_data)
-                )
-            ]
-    elif name == "get-coin-info":
-        request_data = {}
-        if arguments is not None:
-            condi_keys = [
-                "id",
-                "slug",
-                "symbol",
-                "address",
-                "skip_invalid",
-                "aux",
-            ]
-
-            for key in arguments.keys():
-                if key in condi_keys:
-                    request_data[key] = arguments[key]
-
-        async with httpx.AsyncClient() as client:
-            coin_info_url = f"https://{API_BASE}/v2/cryptocurrency/info?{urllib.parse.urlencode(request_data)}"
-
-            coin_info_data = await make_coinmarketcap_request(client, coin_info_url)
-
-            if not coin_info_data:
-                return [types.TextContent(type="text", text="Failed to retrieve coin info data")]
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(coin_info_data)
-                )
-            ]
-    elif name == "get-coin-quotes":
-        request_data = {}
-        if arguments is not None:
-            condi_keys = [
-                "id",
-                "slug",
-                "symbol",
-                "convert",
-                "convert_id",
-                "aux",
-                "skip_invalid",
-            ]
-
-            for key in arguments.keys():
-                if key in condi_keys:
-                    request_data[key] = arguments[key]
-
-        async with httpx.AsyncClient() as client:
-            coin_quotes_url = f"https://{API_BASE}/v2/cryptocurrency/quotes/latest?{urllib.parse.urlencode(request_data)}"
-
-            coin_quotes_data = await make_coinmarketcap_request(client, coin_quotes_url)
-
-            if not coin_quotes_data:
-                return [types.TextContent(type="text", text="Failed to retrieve coin quotes data")]
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(coin_quotes_data)
-                )
-            ]
-    elif name == "listing-protocols":
-
-        async with httpx.AsyncClient() as client:
-            protocols_url = "https://api.llama.fi/protocols"
-
-            protocols_data = await make_defillama_request(client, protocols_url)
-
-            if not protocols_data:
-                return [types.TextContent(type="text", text="Failed to retrieve protocols data")]
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(protocols_data)
-                )
-            ]
-    elif name == "get-protocol-tvl":
-        request_data = {}
-        if arguments is not None:
-            condi_keys = [
-                "protocol",
-            ]
-
-            for key in arguments.keys():
-                if key in condi_keys:
-                    request_data[key] = arguments[key]
-
-        async with httpx.AsyncClient() as client:
-            protocols_url = f"https://api.llama.fi/tvl/{request_data["protocol"]}"
-
-            protocols_data = await make_defillama_request(client, protocols_url)
-
-            if not protocols_data:
-                return [types.TextContent(type="text", text="Failed to retrieve protocols tvl data")]
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(protocols_data)
-                )
-            ]
-    elif name == "get-apr":
-        request_data = {}
-        if arguments is not None:
-            condi_keys = [
-                "liquidStakingId",
-            ]
-
-            for key in arguments.keys():
-                if key in condi_keys:
-                    request_data[key] = arguments[key]
-
-        async with httpx.AsyncClient() as client:
-            protocols_url = f"https://api.expand.network/liquidstaking/getapr?liquidStakingId={request_data['liquidStakingId']}"
-
-            protocols_data = await make_expand_network_request(client, protocols_url)
-
-            if not protocols_data:
-                return [types.TextContent(type="text", text="Failed to retrieve protocols APR data.")]
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(protocols_data)
-                )
-            ]
-    else:
-        raise ValueError(f"Unknown tool: {name}")
+    # Reject bad input (e.g. get-protocol-tvl without "protocol") before any
+    # upstream request is attempted.
+    arguments = arguments or {}
+    try:
+        TOOL_SCHEMAS[name](arguments)
+    except fastjsonschema.JsonSchemaException as e:
+        raise ValueError(f"Invalid arguments for {name}: {e.message}") from e
+
+    return await handler(arguments)
+
+
+# Built once all handlers are registered, since capabilities reflect them.
+_INIT_OPTS = InitializationOptions(
+    server_name="coin-api",
+    server_version="0.1.0",
+    capabilities=server.get_capabilities(
+        notification_options=NotificationOptions(),
+        experimental_capabilities={},
+    ),
+)
 
 
 async def main(api_key: str, defi_api_key: str):
@@ -647,20 +950,34 @@ async def main(api_key: str, defi_api_key: str):
     API_KEY = api_key
     global DEFI_API_KEY
     DEFI_API_KEY = defi_api_key
-    # Run the server using stdin/stdout streams
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="coin-api",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
-            ),
-        )
+    global CMC_CLIENT, LLAMA_CLIENT, EXPAND_CLIENT
+    cmc_headers = {
+        'Accepts': 'application/json',
+        'X-CMC_PRO_API_KEY': API_KEY,
+    }
+    llama_headers = {
+        'accept': '*/*',
+    }
+    expand_headers = {
+        'accept': '*/*',
+    }
+    if DEFI_API_KEY:
+        expand_headers['X-API-Key'] = DEFI_API_KEY
+    CMC_CLIENT = _make_client(API_BASE, cmc_headers)
+    LLAMA_CLIENT = _make_client(LLAMA_API_BASE, llama_headers)
+    EXPAND_CLIENT = _make_client(EXPAND_API_BASE, expand_headers)
+    try:
+        # Run the server using stdin/stdout streams
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                _INIT_OPTS,
+            )
+    finally:
+        await CMC_CLIENT.aclose()
+        await LLAMA_CLIENT.aclose()
+        await EXPAND_CLIENT.aclose()
 
 # This is needed if you'd like to connect to a custom client
 if __name__ == "__main__":
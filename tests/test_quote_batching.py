@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from coin_api_mcp import server
+
+
+class Upstream:
+    """Stands in for CMC's quotes endpoint and records what was asked."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.respond(request)
+
+    def queried(self, key: str) -> list[str]:
+        return [r.url.params[key] for r in self.requests if key in r.url.params]
+
+
+def _quotes(request: httpx.Request) -> httpx.Response:
+    """Answer with one quote per requested symbol or id, keyed like CMC does."""
+    key = "symbol" if "symbol" in request.url.params else "id"
+    values = request.url.params[key].split(",")
+    if key == "symbol":
+        values = [v.upper() for v in values]
+    return httpx.Response(200, json={"status": {"error_code": 0}, "data": {v: {"name": v} for v in values}})
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    def install(respond=_quotes):
+        fake = Upstream(respond)
+        monkeypatch.setattr(server, "CMC_CLIENT", httpx.AsyncClient(
+            base_url=server.API_BASE, transport=httpx.MockTransport(fake)
+        ))
+        return fake
+
+    monkeypatch.setattr(server, "_RETRY_DELAYS", (0.0, 0.0))
+    server._CMC_QUOTES_CACHE.clear()
+    yield install
+    server._CMC_QUOTES_CACHE.clear()
+
+
+def _call(*arguments: dict) -> list[str]:
+    async def run():
+        results = await asyncio.gather(*(server._get_coin_quotes(a) for a in arguments))
+        return [content[0].text for content in results]
+    return asyncio.run(run())
+
+
+def test_concurrent_lookups_share_one_request(upstream):
+    fake = upstream()
+    btc, both = _call({"symbol": "btc"}, {"symbol": "ETH, BTC"})
+    assert fake.queried("symbol") == ["btc,ETH,BTC"]
+    assert orjson.loads(btc)["data"] == {"BTC": {"name": "BTC"}}
+    assert orjson.loads(both)["data"] == {"ETH": {"name": "ETH"}, "BTC": {"name": "BTC"}}
+
+
+def test_caller_missing_from_merged_response_fails(upstream):
+    def respond(request):
+        return httpx.Response(200, json={"status": {"error_code": 0}, "data": {"BTC": {"name": "BTC"}}})
+
+    upstream(respond)
+    btc, eth = _call({"symbol": "BTC"}, {"symbol": "ETH"})
+    assert orjson.loads(btc)["data"] == {"BTC": {"name": "BTC"}}
+    assert eth == server._FAIL_COIN_QUOTES[0].text
+
+
+def test_lookups_by_different_keys_are_not_merged(upstream):
+    fake = upstream()
+    _call({"symbol": "BTC"}, {"id": "1027"})
+    assert sorted(fake.queried("symbol") + fake.queried("id")) == ["1027", "BTC"]
+
+
+def test_lone_lookup_forwards_body_verbatim(upstream):
+    body = b'{"status": {"error_code": 0}, "data": {"BTC": {"name": "Bitcoin"}}}'
+    upstream(lambda request: httpx.Response(200, content=body))
+    [text] = _call({"symbol": "BTC"})
+    assert text == body.decode()
+
+
+def test_cache_hit_skips_batch_window(upstream, monkeypatch):
+    fake = upstream()
+    monkeypatch.setattr(server, "_QUOTE_BATCH_WINDOW", 60)
+    request = server._build_request(server.CMC_CLIENT, server._CMC_QUOTES_URL, {"symbol": "BTC"})
+    server._CMC_QUOTES_CACHE[str(request.url)] = '{"data": {"BTC": {}}}'
+
+    async def run():
+        return await asyncio.wait_for(server._get_coin_quotes({"symbol": "BTC"}), 1)
+
+    assert asyncio.run(run())[0].text == '{"data": {"BTC": {}}}'
+    assert fake.requests == []
+
+
+def test_invalid_entry_falls_back_to_separate_requests(upstream):
+    def respond(request):
+        if "NOPE" in request.url.params["symbol"]:
+            return httpx.Response(400, json={"status": {"error_code": 400}})
+        return _quotes(request)
+
+    fake = upstream(respond)
+    good, bad = _call({"symbol": "BTC"}, {"symbol": "NOPE"})
+    assert fake.queried("symbol") == ["BTC,NOPE", "BTC", "NOPE"]
+    assert orjson.loads(good)["data"] == {"BTC": {"name": "BTC"}}
+    assert bad == server._FAIL_COIN_QUOTES[0].text
+
+
+@pytest.mark.parametrize("status", [401, 402, 403])
+def test_key_rejection_does_not_fan_out(upstream, status):
+    fake = upstream(lambda request: httpx.Response(status, json={"status": {"error_code": status}}))
+    results = _call({"symbol": "BTC"}, {"symbol": "ETH"})
+    assert results == [server._FAIL_COIN_QUOTES[0].text] * 2
+    assert fake.queried("symbol") == ["BTC,ETH"]
+
+
+def test_transient_failure_does_not_fan_out(upstream):
+    fake = upstream(lambda request: httpx.Response(503))
+    results = _call({"symbol": "BTC"}, {"symbol": "ETH"})
+    assert results == [server._FAIL_COIN_QUOTES[0].text] * 2
+    assert fake.queried("symbol") == ["BTC,ETH"] * (len(server._RETRY_DELAYS) + 1)
@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+import pytest
+from cachetools import TTLCache
+
+from coin_api_mcp import server
+
+
+def _status_error(status: int, headers: dict[str, str] | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://example.test/x")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"{status}", request=request, response=response)
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url="https://example.test", transport=httpx.MockTransport(handler))
+
+
+def _fetch(handler) -> str | None:
+    async def run():
+        async with _client(handler) as client:
+            return await server._fetch_text(client, asyncio.Semaphore(1), TTLCache(maxsize=8, ttl=60), "/x", None)
+    return asyncio.run(run())
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(server, "_RETRY_DELAYS", (0.0, 0.0))
+
+
+def test_retry_after_within_limit_is_honoured():
+    assert server._retry_delay(_status_error(429, {"Retry-After": "2"}), 0) == 2.0
+    assert server._retry_delay(_status_error(429, {"Retry-After": "5"}), 0) == 5.0
+
+
+def test_retry_after_over_limit_gives_up():
+    assert server._retry_delay(_status_error(429, {"Retry-After": "30"}), 0) is None
+
+
+def test_retryable_status_without_retry_after_backs_off(monkeypatch):
+    monkeypatch.setattr(server, "_RETRY_DELAYS", (0.1, 0.3))
+    for attempt, base in enumerate(server._RETRY_DELAYS):
+        delay = server._retry_delay(_status_error(503), attempt)
+        assert base / 2 <= delay <= base * 1.5
+    assert server._retry_delay(_status_error(503), len(server._RETRY_DELAYS)) is None
+
+
+def test_client_errors_are_not_retried():
+    assert server._retry_delay(_status_error(400), 0) is None
+    assert server._retry_delay(_status_error(404), 0) is None
+
+
+def test_5xx_exhausts_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(502)
+
+    assert _fetch(handler) is None
+    assert len(calls) == len(server._RETRY_DELAYS) + 1
+
+
+def test_4xx_is_tried_once():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={"status": {"error_message": "bad"}})
+
+    assert _fetch(handler) is None
+    assert len(calls) == 1
+
+
+def test_transient_failure_then_success():
+    responses = iter([httpx.Response(503), httpx.Response(200, json={"data": 1})])
+    assert _fetch(lambda request: next(responses)) == '{"data":1}'
+
+
+def test_non_retryable_errors_are_logged(caplog):
+    def handler(request):
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    assert _fetch(handler) is None
+    assert "GET /x failed" in caplog.text
+
+
+def test_fetch_or_raise_reports_status():
+    async def run():
+        async with _client(lambda request: httpx.Response(400)) as client:
+            await server._fetch_text_or_raise(client, asyncio.Semaphore(1), TTLCache(maxsize=8, ttl=60), "/x", None)
+
+    with pytest.raises(httpx.HTTPStatusError) as e:
+        asyncio.run(run())
+    assert e.value.response.status_code == 400
+
+
+@pytest.mark.parametrize("body", [b"", b"{}", b" [] ", b"<html>Bad gateway</html>"])
+def test_empty_or_non_json_body_is_a_failure(body):
+    assert _fetch(lambda request: httpx.Response(200, content=body)) is None